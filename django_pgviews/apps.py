@@ -13,6 +13,7 @@ class ViewConfig(apps.AppConfig):
     """
 
     counter = 0
+    total = 0
     name = "django_pgviews"
     verbose_name = "Django Postgres Views"
 
@@ -21,9 +22,8 @@ class ViewConfig(apps.AppConfig):
         Forcibly sync the views.
         """
         self.counter = self.counter + 1
-        total = len([a for a in apps.apps.get_app_configs() if a.models_module is not None])
 
-        if self.counter == total:
+        if self.counter == self.total:
             logger.info("All applications have migrated, time to sync")
             # Import here otherwise Django doesn't start properly
             # (models in app init are not allowed)
@@ -49,4 +49,6 @@ class ViewConfig(apps.AppConfig):
         sync_enabled = getattr(settings, "MATERIALIZED_VIEWS_DISABLE_SYNC_ON_MIGRATE", False) is False
 
         if sync_enabled:
+            # post_migrate is sent once per app with models, the set of which is final once the apps are ready
+            self.total = len([a for a in apps.apps.get_app_configs() if a.models_module is not None])
             signals.post_migrate.connect(self.sync_pgviews)
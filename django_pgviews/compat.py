@@ -1,6 +1,23 @@
-__all__ = ["ProgrammingError"]
+import contextlib
+
+__all__ = ["ProgrammingError", "pipeline"]
 
 try:
-    from psycopg import ProgrammingError
+    from psycopg import Pipeline, ProgrammingError
 except ImportError:
     from psycopg2 import ProgrammingError
+
+    Pipeline = None
+
+
+def pipeline(connection):
+    """
+    Send the statements executed on a connection in pipeline mode, without waiting for each result.
+
+    Only psycopg 3 on libpq 14+ supports this, otherwise the statements are sent one by one as usual.
+    Statements inside the block must not need their results.
+    """
+    if Pipeline is None or not Pipeline.is_supported():
+        return contextlib.nullcontext()
+    connection.ensure_connection()
+    return connection.connection.pipeline()
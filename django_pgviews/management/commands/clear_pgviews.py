@@ -1,10 +1,10 @@
+import collections
 import logging
 
-from django.apps import apps
 from django.core.management.base import BaseCommand
 from django.db import DEFAULT_DB_ALIAS
 
-from django_pgviews.view import MaterializedView, View, clear_view
+from django_pgviews.view import MaterializedView, clear_views, get_view_models
 
 logger = logging.getLogger("django_pgviews.sync_pgviews")
 
@@ -20,18 +20,22 @@ class Command(BaseCommand):
         )
 
     def handle(self, database, **options):
-        for view_cls in apps.get_models():
-            if not (isinstance(view_cls, type) and issubclass(view_cls, View) and hasattr(view_cls, "sql")):
-                continue
-            python_name = f"{view_cls._meta.app_label}.{view_cls.__name__}"
+        # Group the views per connection and kind, so each group gets dropped in one statement
+        to_clear = collections.defaultdict(list)
+        for view_cls in get_view_models():
             connection = view_cls.get_view_connection(using=database, restricted_mode=True)
             if not connection:
                 continue
-            status = clear_view(
-                connection, view_cls._meta.db_table, materialized=isinstance(view_cls(), MaterializedView)
+            to_clear[connection, issubclass(view_cls, MaterializedView)].append(view_cls)
+
+        for (connection, materialized), view_classes in to_clear.items():
+            status = clear_views(
+                connection, [view_cls._meta.db_table for view_cls in view_classes], materialized=materialized
             )
             if status == "DROPPED":
                 msg = "dropped"
             else:
                 msg = "not dropped"
-            logger.info("%s (%s): %s", python_name, view_cls._meta.db_table, msg)
+            for view_cls in view_classes:
+                python_name = f"{view_cls._meta.app_label}.{view_cls.__name__}"
+                logger.info("%s (%s): %s", python_name, view_cls._meta.db_table, msg)
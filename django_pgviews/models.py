@@ -1,33 +1,78 @@
 import logging
-
-from django.apps import apps
+from collections import defaultdict, deque
 
 from django_pgviews.signals import all_views_synced, view_synced
-from django_pgviews.view import MaterializedView, View, create_materialized_view, create_view
+from django_pgviews.view import (
+    CustomSchemaEditor,
+    MaterializedView,
+    ViewIntrospection,
+    create_materialized_view,
+    create_view,
+    get_view_models,
+)
 
 logger = logging.getLogger("django_pgviews.sync_pgviews")
 exists_logger = logging.getLogger("django_pgviews.sync_pgviews.exists")
 
 
+def _view_name(view_cls):
+    return f"{view_cls._meta.app_label}.{view_cls.__name__}"
+
+
+def _sort_by_dependencies(view_models):
+    """Orders the view models so that every view comes after the views it depends on.
+
+    Dependencies on views that aren't in `view_models` are ignored. Returns a tuple of the ordered views and the views
+    which can't be ordered, because they're part of a dependency cycle or depend on a view that is.
+    """
+    names = defaultdict(list)
+    for view_cls in view_models:
+        names[_view_name(view_cls)].append(view_cls)
+
+    # Kahn's algorithm, keeping the original order among views which don't depend on each other
+    pending = {}
+    dependents = defaultdict(list)
+    for view_cls in view_models:
+        dependencies = [dep_cls for dep in set(view_cls._dependencies) for dep_cls in names.get(dep, ())]
+        pending[view_cls] = len(dependencies)
+        for dep_cls in dependencies:
+            dependents[dep_cls].append(view_cls)
+
+    ready = deque(view_cls for view_cls in view_models if not pending[view_cls])
+    ordered = []
+    while ready:
+        view_cls = ready.popleft()
+        ordered.append(view_cls)
+        for dependent in dependents[view_cls]:
+            pending[dependent] -= 1
+            if not pending[dependent]:
+                ready.append(dependent)
+
+    unordered = [view_cls for view_cls in view_models if pending[view_cls]]
+    return ordered, unordered
+
+
 class RunBacklog:
     def __init__(self) -> None:
         super().__init__()
-        self.finished = []
+        self.finished = set()
 
     def run(self, **kwargs):
-        self.finished = []
-        backlog = []
-        for view_cls in apps.get_models():
-            if not (isinstance(view_cls, type) and issubclass(view_cls, View) and hasattr(view_cls, "sql")):
-                continue
-            backlog.append(view_cls)
-        loop = 0
-        while len(backlog) > 0 and loop < 10:
-            loop += 1
-            backlog = self.run_backlog(backlog, **kwargs)
-
-        if loop >= 10:
-            logger.warning("pgviews dependencies hit limit. Check if your model dependencies are correct")
+        self.finished = set()
+        backlog, circular = _sort_by_dependencies(list(get_view_models()))
+
+        # the views outside of any dependency cycle are still processed
+        backlog = self.run_backlog(backlog, **kwargs)
+
+        if circular:
+            logger.warning(
+                "pgviews dependencies are circular, skipped %s. Check if your model dependencies are correct",
+                ", ".join(_view_name(view_cls) for view_cls in circular),
+            )
+            return False
+
+        if backlog:
+            logger.warning("pgviews dependencies couldn't be satisfied. Check if your model dependencies are correct")
             return False
 
         return True
@@ -38,26 +83,34 @@ class RunBacklog:
 
 class ViewSyncer(RunBacklog):
     def run(self, force, update, using, materialized_views_check_sql_changed=False, **options):
-        if super().run(
-            force=force,
-            update=update,
-            using=using,
-            materialized_views_check_sql_changed=materialized_views_check_sql_changed,
-        ):
+        # existing views, a cursor and a schema editor per connection, shared by the whole run
+        self.introspections = {}
+        self.cursors = {}
+        self.schema_editors = {}
+        try:
+            synced = super().run(
+                force=force,
+                update=update,
+                using=using,
+                materialized_views_check_sql_changed=materialized_views_check_sql_changed,
+            )
+        finally:
+            for cursor in self.cursors.values():
+                cursor.close()
+
+        if synced:
             all_views_synced.send(sender=None, using=using)
 
     def run_backlog(self, backlog, *, force, update, using, materialized_views_check_sql_changed, **kwargs):
-        """Installs the list of models given from the previous backlog
+        """Installs the list of models given, which are sorted by their dependencies
 
         If the correct dependent views have not been installed, the view
-        will be added to the backlog.
-
-        Eventually we get to a point where all dependencies are sorted.
+        is skipped and returned in the new backlog.
         """
         new_backlog = []
         for view_cls in backlog:
             skip = False
-            name = f"{view_cls._meta.app_label}.{view_cls.__name__}"
+            name = _view_name(view_cls)
             for dep in view_cls._dependencies:
                 if dep not in self.finished:
                     skip = True
@@ -71,12 +124,28 @@ class ViewSyncer(RunBacklog):
 
                 if skip is True:
                     new_backlog.append(view_cls)
-                    logger.info("Putting pgview at back of queue: %s", name)
+                    logger.info("Skipping pgview %s, its dependencies aren't synced", name)
                     continue  # Skip
 
-                if isinstance(view_cls(), MaterializedView):
+                introspection = self.introspections.get(connection)
+                if introspection is None:
+                    introspection = self.introspections[connection] = ViewIntrospection(connection)
+                cursor = self.cursors.get(connection)
+                if cursor is None:
+                    cursor = self.cursors[connection] = connection.cursor()
+
+                if issubclass(view_cls, MaterializedView):
+                    schema_editor = self.schema_editors.get(connection)
+                    if schema_editor is None:
+                        schema_editor = self.schema_editors[connection] = CustomSchemaEditor(connection)
+
                     status = create_materialized_view(
-                        connection, view_cls, check_sql_changed=materialized_views_check_sql_changed
+                        connection,
+                        view_cls,
+                        check_sql_changed=materialized_views_check_sql_changed,
+                        introspection=introspection,
+                        cursor=cursor,
+                        schema_editor=schema_editor,
                     )
                 else:
                     status = create_view(
@@ -85,6 +154,8 @@ class ViewSyncer(RunBacklog):
                         view_cls.get_sql(),
                         update=update,
                         force=force,
+                        introspection=introspection,
+                        cursor=cursor,
                     )
 
                 view_synced.send(
@@ -95,7 +166,7 @@ class ViewSyncer(RunBacklog):
                     has_changed=status not in ("EXISTS", "FORCE_REQUIRED"),
                     using=using,
                 )
-                self.finished.append(name)
+                self.finished.add(name)
             except Exception as exc:
                 exc.view_cls = view_cls
                 exc.python_name = name
@@ -129,7 +200,7 @@ class ViewRefresher(RunBacklog):
         new_backlog = []
         for view_cls in backlog:
             skip = False
-            name = f"{view_cls._meta.app_label}.{view_cls.__name__}"
+            name = _view_name(view_cls)
             for dep in view_cls._dependencies:
                 if dep not in self.finished:
                     skip = True
@@ -137,7 +208,7 @@ class ViewRefresher(RunBacklog):
 
             if skip is True:
                 new_backlog.append(view_cls)
-                logger.info("Putting pgview at back of queue: %s", name)
+                logger.info("Skipping pgview %s, its dependencies aren't synced", name)
                 continue  # Skip
 
             # Don't refresh views not associated with this database
@@ -149,6 +220,6 @@ class ViewRefresher(RunBacklog):
                 view_cls.refresh(concurrently=concurrently)
                 logger.info("pgview %s refreshed", name)
 
-            self.finished.append(name)
+            self.finished.add(name)
 
         return new_backlog
@@ -1,3 +1,12 @@
+"""
+Signals sent by sync_pgviews.
+
+``view_synced`` is sent after each view is synced, with the view model as the sender and the keyword arguments
+``update``, ``force``, ``status``, ``has_changed`` and ``using``.
+
+``all_views_synced`` is sent once all views have been synced, with no sender and the ``using`` keyword argument.
+"""
+
 from django.dispatch import Signal
 
 view_synced = Signal()
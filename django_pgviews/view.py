@@ -1,7 +1,9 @@
 """Helpers to access Postgres views from the Django ORM."""
 
 import collections
+import contextlib
 import copy
+import functools
 import logging
 import re
 
@@ -12,7 +14,7 @@ from django.db.backends.postgresql.schema import DatabaseSchemaEditor
 from django.db.backends.utils import truncate_name
 from django.db.models.query import QuerySet
 
-from django_pgviews.compat import ProgrammingError
+from django_pgviews.compat import ProgrammingError, pipeline
 from django_pgviews.db import get_fields_by_name
 
 FIELD_SPEC_REGEX = r"^([A-Za-z_][A-Za-z0-9_]*)\." r"([A-Za-z_][A-Za-z0-9_]*)\." r"(\*|(?:[A-Za-z_][A-Za-z0-9_]*))$"
@@ -48,6 +50,10 @@ _DEFERRED_PROJECTIONS = collections.defaultdict(lambda: collections.defaultdict(
 
 def realize_deferred_projections(sender, *args, **kwargs):
     """Project any fields which were deferred pending model preparation."""
+    if not _DEFERRED_PROJECTIONS:
+        # nothing is pending for most of the models being prepared
+        return
+
     app_label = sender._meta.app_label
     model_name = sender.__name__.lower()
     pending = _DEFERRED_PROJECTIONS.pop((app_label, model_name), {})
@@ -64,26 +70,36 @@ def realize_deferred_projections(sender, *args, **kwargs):
 models.signals.class_prepared.connect(realize_deferred_projections)
 
 
+@functools.lru_cache(maxsize=None)
+def _parse_field_spec(field_name):
+    """
+    Parses an `app_label.ModelName.field_name` (or `app_label.ModelName.*`) projection specifier into its three parts.
+
+    Returns None if the specifier isn't valid. Accepts the same specifiers as `FIELD_SPEC_RE`, without the regex.
+    """
+    parts = field_name.split(".")
+    if len(parts) != 3 or not field_name.isascii():
+        return None
+
+    app_label, model_name, name = parts
+    if app_label.isidentifier() and model_name.isidentifier() and (name == "*" or name.isidentifier()):
+        return app_label, model_name, name
+    return None
+
+
 def _schema_and_name(connection, view_name):
     if "." in view_name:
         return view_name.split(".", 1)
     else:
-        try:
-            schema_name = connection.schema_name
-        except AttributeError:
-            schema_name = None
-
-        return schema_name, view_name
+        return getattr(connection, "schema_name", None), view_name
 
 
 def _create_mat_view(cursor, view_name, query, params, with_data):
     """
     Creates a materialized view using a specific cursor, name and definition.
     """
-    cursor.execute(
-        "CREATE MATERIALIZED VIEW {} AS {} {};".format(view_name, query, "WITH DATA" if with_data else "WITH NO DATA"),
-        params,
-    )
+    data = "WITH DATA" if with_data else "WITH NO DATA"
+    cursor.execute(f"CREATE MATERIALIZED VIEW {view_name} AS {query} {data};", params)
 
 
 def _drop_mat_view(cursor, view_name):
@@ -93,15 +109,21 @@ def _drop_mat_view(cursor, view_name):
     cursor.execute(f"DROP MATERIALIZED VIEW IF EXISTS {view_name} CASCADE;")
 
 
+@functools.lru_cache(maxsize=None)
 def _concurrent_index_name(view_name, concurrent_index):
     # replace . with _ in view_name in case the table is in a schema
     return view_name.replace(".", "_") + "_" + "_".join([s.strip() for s in concurrent_index.split(",")]) + "_index"
 
 
-def _create_concurrent_index(cursor, view_name, concurrent_index):
-    cursor.execute(
-        f"CREATE UNIQUE INDEX {_concurrent_index_name(view_name, concurrent_index)} ON {view_name} ({concurrent_index})"
-    )
+def _create_concurrent_index_sql(view_name, concurrent_index, concurrently=False):
+    index_name = _concurrent_index_name(view_name, concurrent_index)
+    if concurrently:
+        return f"CREATE UNIQUE INDEX CONCURRENTLY {index_name} ON {view_name} ({concurrent_index})"
+    return f"CREATE UNIQUE INDEX {index_name} ON {view_name} ({concurrent_index})"
+
+
+def _create_concurrent_index(cursor, view_name, concurrent_index, concurrently=False):
+    cursor.execute(_create_concurrent_index_sql(view_name, concurrent_index, concurrently=concurrently))
 
 
 class CustomSchemaEditor(DatabaseSchemaEditor):
@@ -129,9 +151,9 @@ def _make_where(**kwargs):
             continue
 
         if isinstance(value, (list, tuple)):
-            in_fragment = ", ".join("%s" for _ in range(len(value)))
-            where_fragments.append(f"{key} IN ({in_fragment})")
-            params.extend(list(value))
+            # a single array parameter, rather than one placeholder per value
+            where_fragments.append(f"{key} = ANY(%s)")
+            params.append(list(value))
         else:
             where_fragments.append(f"{key} = %s")
             params.append(value)
@@ -139,54 +161,219 @@ def _make_where(**kwargs):
     return where_fragment, params
 
 
-def _ensure_indexes(connection, cursor, view_cls, schema_name_log):
+def _ensure_indexes(
+    connection, cursor, view_cls, vschema, vname, schema_name_log, schema_editor=None, introspection=None
+):
     """
     This function gets called when a materialized view is deemed not needing a re-create. That is however only a part
     of the story, since that checks just the SQL of the view itself. The second part is the indexes.
     This function gets the current indexes on the materialized view and reconciles them with the indexes that
     should be in the view, dropping extra ones and creating new ones.
+
+    When the connection isn't in a transaction, the indexes are dropped and created concurrently, so that reads of the
+    (already populated) view aren't blocked while that happens. A failed concurrent build leaves an invalid index
+    behind, which isn't used by queries, so invalid indexes are always dropped and created again.
     """
     view_name = view_cls._meta.db_table
     concurrent_index = view_cls._concurrent_index
     indexes = view_cls._meta.indexes
-    vschema, vname = _schema_and_name(connection, view_name)
 
-    where_fragment, params = _make_where(schemaname=vschema, tablename=vname)
-    cursor.execute(f"SELECT indexname FROM pg_indexes WHERE {where_fragment}", params)
+    if introspection is not None:
+        existing_indexes = introspection.indexes(vschema, vname)
+    else:
+        where_fragment, params = _make_where(**{"n.nspname": vschema, "t.relname": vname})
+        cursor.execute(
+            "SELECT i.relname, x.indisvalid FROM pg_index x "
+            "JOIN pg_class i ON i.oid = x.indexrelid "
+            "JOIN pg_class t ON t.oid = x.indrelid "
+            f"JOIN pg_namespace n ON n.oid = t.relnamespace WHERE {where_fragment}",
+            params,
+        )
+        existing_indexes = dict(cursor)
+
+    valid_indexes = {index_name for index_name, valid in existing_indexes.items() if valid}
+    invalid_indexes = set(existing_indexes) - valid_indexes
 
-    existing_indexes = {x[0] for x in cursor.fetchall()}
-    required_indexes = {x.name for x in indexes}
+    indexes_by_name = {x.name: x for x in indexes}
+    required_indexes = set(indexes_by_name)
 
-    if view_cls._concurrent_index is not None:
+    if concurrent_index is not None:
         concurrent_index_name = _concurrent_index_name(view_name, concurrent_index)
         required_indexes.add(concurrent_index_name)
     else:
         concurrent_index_name = None
 
-    for index_name in existing_indexes - required_indexes:
+    if valid_indexes == required_indexes and not invalid_indexes:
+        return
+
+    # CONCURRENTLY can't be used inside a transaction block
+    concurrently = connection.get_autocommit() and not connection.in_atomic_block
+
+    # collect all the index changes, so they can be sent to the database in a single round-trip
+    statements = []
+    dropped_indexes = (valid_indexes - required_indexes) | invalid_indexes
+    created_indexes = []
+
+    if dropped_indexes:
         if vschema:
-            full_index_name = f"{vschema}.{index_name}"
+            full_index_names = [f"{vschema}.{index_name}" for index_name in dropped_indexes]
         else:
-            full_index_name = index_name
-        cursor.execute(f"DROP INDEX {full_index_name}")
-        logger.info("pgview dropped index %s on view %s (%s)", index_name, view_name, schema_name_log)
+            full_index_names = list(dropped_indexes)
+
+        if concurrently:
+            # DROP INDEX CONCURRENTLY only accepts a single index
+            statements.extend(f"DROP INDEX CONCURRENTLY {full_index_name}" for full_index_name in full_index_names)
+        else:
+            statements.append(f"DROP INDEX {', '.join(full_index_names)}")
 
-    schema_editor: DatabaseSchemaEditor = CustomSchemaEditor(connection)
+    if schema_editor is None:
+        schema_editor = CustomSchemaEditor(connection)
 
-    for index_name in required_indexes - existing_indexes:
+    for index_name in required_indexes - valid_indexes:
+        if index_name == concurrent_index_name:
+            statements.append(_create_concurrent_index_sql(view_name, concurrent_index, concurrently=concurrently))
+            created_indexes.append(index_name)
+        else:
+            index = indexes_by_name[index_name]
+            statements.append(str(index.create_sql(view_cls, schema_editor, concurrently=concurrently)))
+            created_indexes.append(index_name)
+
+    if concurrently:
+        # a query with multiple statements runs as a single transaction block, so these have to be sent one by one
+        for statement in statements:
+            cursor.execute(statement)
+    elif statements:
+        # no params, so psycopg accepts multiple statements in one execute
+        cursor.execute(";\n".join(statements))
+
+    for index_name in dropped_indexes:
+        logger.info("pgview dropped index %s on view %s (%s)", index_name, view_name, schema_name_log)
+    for index_name in created_indexes:
         if index_name == concurrent_index_name:
-            _create_concurrent_index(cursor, view_name, concurrent_index)
             logger.info("pgview created concurrent index on view %s (%s)", view_name, schema_name_log)
         else:
-            for index in indexes:
-                if index.name == index_name:
-                    schema_editor.add_index(view_cls, index)
-                    logger.info("pgview created index %s on view %s (%s)", index.name, view_name, schema_name_log)
-                    break
+            logger.info("pgview created index %s on view %s (%s)", index_name, view_name, schema_name_log)
 
 
-@transaction.atomic()
-def create_materialized_view(connection, view_cls, check_sql_changed=False):
+class ViewIntrospection:
+    """
+    The views and materialized views existing on a connection, fetched with a single query on first use, as well as
+    the indexes of the materialized views, fetched with another query when first needed.
+
+    Used when syncing many views at once, so each view doesn't need its own catalog queries to check whether it exists
+    and which indexes it has. Call ``invalidate()`` after dropping anything with CASCADE, as that might remove other
+    views too.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self._views = None
+        self._indexes = None
+
+    def _fetch(self):
+        cursor_wrapper = self.connection.cursor()
+        cursor = cursor_wrapper.cursor
+        try:
+            cursor.execute(
+                "SELECT schemaname, viewname, FALSE, NULL FROM pg_views "
+                "WHERE schemaname NOT IN ('pg_catalog', 'information_schema') "
+                "UNION ALL "
+                "SELECT schemaname, matviewname, TRUE, definition FROM pg_matviews;"
+            )
+            views = collections.defaultdict(dict)
+            for schema_name, name, materialized, definition in cursor:
+                views[materialized, name][schema_name] = definition
+            return views
+        finally:
+            cursor_wrapper.close()
+
+    def _fetch_indexes(self):
+        cursor_wrapper = self.connection.cursor()
+        cursor = cursor_wrapper.cursor
+        try:
+            cursor.execute(
+                "SELECT n.nspname, t.relname, i.relname, x.indisvalid FROM pg_index x "
+                "JOIN pg_class i ON i.oid = x.indexrelid "
+                "JOIN pg_class t ON t.oid = x.indrelid "
+                "JOIN pg_namespace n ON n.oid = t.relnamespace "
+                "WHERE t.relkind = 'm';"
+            )
+            indexes = collections.defaultdict(lambda: collections.defaultdict(dict))
+            for schema_name, name, index_name, valid in cursor:
+                indexes[name][schema_name][index_name] = valid
+            return indexes
+        finally:
+            cursor_wrapper.close()
+
+    def lookup(self, vschema, vname, materialized):
+        """
+        Returns a tuple of whether the view exists and its definition (only fetched for materialized views).
+
+        If ``vschema`` is None, the view is looked up in any schema.
+        """
+        if self._views is None:
+            self._views = self._fetch()
+
+        definitions = self._views.get((materialized, vname), {})
+        if vschema is None:
+            if not definitions:
+                return False, None
+            return True, next(iter(definitions.values()))
+        if vschema not in definitions:
+            return False, None
+        return True, definitions[vschema]
+
+    def indexes(self, vschema, vname):
+        """
+        Returns a dict of the names of the indexes on a materialized view to whether they're valid, fetched for all
+        materialized views at once.
+
+        If ``vschema`` is None, the indexes of the materialized views with that name in any schema are returned.
+        """
+        if self._indexes is None:
+            self._indexes = self._fetch_indexes()
+
+        by_schema = self._indexes.get(vname, {})
+        if vschema is None:
+            return {
+                index_name: valid
+                for schema_indexes in by_schema.values()
+                for index_name, valid in schema_indexes.items()
+            }
+        return dict(by_schema.get(vschema, {}))
+
+    def invalidate(self):
+        self._views = None
+        self._indexes = None
+
+
+@contextlib.contextmanager
+def _use_cursor(connection, cursor=None):
+    """
+    Yields the DB-API cursor of ``cursor`` if it's passed, leaving it open, otherwise of a new cursor on the
+    connection, which gets closed afterwards.
+    """
+    if cursor is not None:
+        yield cursor.cursor
+        return
+
+    cursor_wrapper = connection.cursor()
+    try:
+        yield cursor_wrapper.cursor
+    finally:
+        cursor_wrapper.close()
+
+
+def _schema_name_log(connection):
+    schema_name = getattr(connection, "schema_name", None)
+    if schema_name is None:
+        return "default schema"
+    return f"schema {schema_name}"
+
+
+def create_materialized_view(
+    connection, view_cls, check_sql_changed=False, introspection=None, cursor=None, schema_editor=None
+):
     """
     Create a materialized view on a connection.
 
@@ -197,83 +384,149 @@ def create_materialized_view(connection, view_cls, check_sql_changed=False):
     If check_sql_changed = True, then the process will first check if there is a materialized view in the database
     already with the same SQL, if there is, it will not do anything. Otherwise the materialized view gets dropped
     and recreated.
+
+    The view and its indexes are created together in a transaction. If the view is unchanged (EXISTS) though, its
+    indexes are reconciled afterwards, outside of that transaction, so they can be built concurrently. The call is
+    therefore not atomic as a whole: if reconciling the indexes fails, the view is left in place with only some of
+    its indexes, and they get reconciled again on the next call.
+
+    If introspection is passed (a ViewIntrospection for the connection), it's used instead of querying whether the
+    materialized view exists and which indexes it has.
+
+    If cursor is passed (a cursor on the connection), it's used instead of opening a new one, and left open.
+    Likewise, schema_editor (a CustomSchemaEditor for the connection) is used to create the indexes if passed.
     """
-    view_name = view_cls._meta.db_table
-    view_query = view_cls.get_sql()
-    concurrent_index = view_cls._concurrent_index
+    # resolved once, and shared by the creation and the index reconciliation
+    vschema, vname = _schema_and_name(connection, view_cls._meta.db_table)
+    schema_name_log = _schema_name_log(connection)
 
-    try:
-        schema_name = connection.schema_name
-        schema_name_log = f"schema {schema_name}"
-    except AttributeError:
-        schema_name_log = "default schema"
+    status = _create_materialized_view(
+        connection, view_cls, vschema, vname, schema_name_log, check_sql_changed, introspection, cursor, schema_editor
+    )
 
-    vschema, vname = _schema_and_name(connection, view_name)
+    if status == "EXISTS":
+        # the indexes are reconciled outside the transaction, so they can be created concurrently
+        with _use_cursor(connection, cursor) as db_cursor:
+            _ensure_indexes(
+                connection, db_cursor, view_cls, vschema, vname, schema_name_log, schema_editor, introspection
+            )
+
+    return status
 
-    cursor_wrapper = connection.cursor()
-    cursor = cursor_wrapper.cursor
+
+def _create_materialized_view(
+    connection, view_cls, vschema, vname, schema_name_log, check_sql_changed, introspection, cursor, schema_editor
+):
+    view_name = view_cls._meta.db_table
+    view_query = view_cls.get_sql()
+    concurrent_index = view_cls._concurrent_index
+    indexes = view_cls._meta.indexes
 
     where_fragment, params = _make_where(schemaname=vschema, matviewname=vname)
 
-    try:
-        cursor.execute(
-            f"SELECT COUNT(*) FROM pg_matviews WHERE {where_fragment};",
-            params,
-        )
-        view_exists = cursor.fetchone()[0] > 0
+    # the transaction has to be on the connection of the view, which isn't necessarily the default one
+    with transaction.atomic(using=connection.alias), _use_cursor(connection, cursor) as db_cursor:
+        if introspection is not None:
+            view_exists, definition = introspection.lookup(vschema, vname, materialized=True)
+        else:
+            # fetch the definition together with the existence check, it's needed when checking if the SQL changed
+            db_cursor.execute(
+                f"SELECT definition FROM pg_matviews WHERE {where_fragment};",
+                params,
+            )
+            row = db_cursor.fetchone()
+            view_exists = row is not None
+            definition = row[0] if view_exists else None
 
         query = view_query.query.strip()
         if query.endswith(";"):
             query = query[:-1]
 
         if check_sql_changed and view_exists:
-            temp_viewname = truncate_name(view_name + "_temp", length=63)
-            _, temp_vname = _schema_and_name(connection, temp_viewname)
-
-            _drop_mat_view(cursor, temp_viewname)
-            _create_mat_view(cursor, temp_viewname, query, view_query.params, with_data=False)
+            # Let Postgres normalise the new SQL through a temporary (plain) view, which is much cheaper to create than
+            # a materialized view. It's created in the transaction on the view's connection, which rolls back on any
+            # error, so the temporary view can't be left over in the session.
+            temp_viewname = truncate_name(vname + "_temp", length=63)
 
-            definitions_where, definitions_params = _make_where(schemaname=vschema, matviewname=[vname, temp_vname])
-            cursor.execute(
-                f"SELECT definition FROM pg_matviews WHERE {definitions_where};",
-                definitions_params,
-            )
-            definitions = cursor.fetchall()
+            db_cursor.execute(f"CREATE TEMPORARY VIEW {temp_viewname} AS {query};", view_query.params)
+            db_cursor.execute("SELECT pg_get_viewdef(%s::regclass);", [f"pg_temp.{temp_viewname}"])
+            temp_definition = db_cursor.fetchone()[0]
+            db_cursor.execute(f"DROP VIEW pg_temp.{temp_viewname};")
 
-            _drop_mat_view(cursor, temp_viewname)
-
-            if definitions[0] == definitions[1]:
-                _ensure_indexes(connection, cursor, view_cls, schema_name_log)
+            if definition == temp_definition:
                 return "EXISTS"
 
-        if view_exists:
-            _drop_mat_view(cursor, view_name)
-            logger.info("pgview dropped materialized view %s (%s)", view_name, schema_name_log)
-
-        _create_mat_view(cursor, view_name, query, view_query.params, with_data=view_cls.with_data)
-        logger.info("pgview created materialized view %s (%s)", view_name, schema_name_log)
-
-        if concurrent_index is not None:
-            _create_concurrent_index(cursor, view_name, concurrent_index)
-            logger.info("pgview created concurrent index on view %s (%s)", view_name, schema_name_log)
-
-        if view_cls._meta.indexes:
-            schema_editor = CustomSchemaEditor(connection)
-
-            for index in view_cls._meta.indexes:
-                schema_editor.add_index(view_cls, index)
-                logger.info("pgview created index %s on view %s (%s)", index.name, view_name, schema_name_log)
+        # nothing below depends on a query result, so the statements can be sent without waiting on each other
+        with pipeline(connection):
+            if view_exists and view_cls.rebuild_online:
+                # Populate and index the new version under temporary names first, the old version can still be read
+                # meanwhile. It only gets locked by the drop, after which there are just the renames left.
+                new_viewname = truncate_name(view_name + "_new", length=63)
+                index_renames = []
+
+                # a leftover from an earlier failed rebuild, its indexes are dropped together with it
+                _drop_mat_view(db_cursor, new_viewname)
+                _create_mat_view(db_cursor, new_viewname, query, view_query.params, with_data=view_cls.with_data)
+
+                if concurrent_index is not None:
+                    index_name = _concurrent_index_name(view_name, concurrent_index)
+                    temp_index_name = truncate_name(index_name + "_new", length=63)
+                    db_cursor.execute(f"CREATE UNIQUE INDEX {temp_index_name} ON {new_viewname} ({concurrent_index})")
+                    index_renames.append((temp_index_name, index_name))
+
+                if indexes:
+                    if schema_editor is None:
+                        schema_editor = CustomSchemaEditor(connection)
+
+                    for index in indexes:
+                        temp_index_name = truncate_name(index.name + "_new", length=63)
+                        statement = index.create_sql(view_cls, schema_editor)
+                        statement.parts["table"] = new_viewname
+                        statement.parts["name"] = temp_index_name
+                        db_cursor.execute(str(statement))
+                        index_renames.append((temp_index_name, index.name))
+
+                _drop_mat_view(db_cursor, view_name)
+                db_cursor.execute(f"ALTER MATERIALIZED VIEW {new_viewname} RENAME TO {vname};")
+                for temp_index_name, index_name in index_renames:
+                    qualified_name = f"{vschema}.{temp_index_name}" if vschema else temp_index_name
+                    db_cursor.execute(f"ALTER INDEX {qualified_name} RENAME TO {index_name};")
+
+                logger.info("pgview rebuilt materialized view %s (%s)", view_name, schema_name_log)
+                if introspection is not None:
+                    introspection.invalidate()
+
+                return "UPDATED"
+
+            if view_exists:
+                _drop_mat_view(db_cursor, view_name)
+                logger.info("pgview dropped materialized view %s (%s)", view_name, schema_name_log)
+                if introspection is not None:
+                    introspection.invalidate()
+
+            _create_mat_view(db_cursor, view_name, query, view_query.params, with_data=view_cls.with_data)
+            logger.info("pgview created materialized view %s (%s)", view_name, schema_name_log)
+
+            if concurrent_index is not None:
+                _create_concurrent_index(db_cursor, view_name, concurrent_index)
+                logger.info("pgview created concurrent index on view %s (%s)", view_name, schema_name_log)
+
+            if indexes:
+                if schema_editor is None:
+                    schema_editor = CustomSchemaEditor(connection)
+
+                for index in indexes:
+                    schema_editor.add_index(view_cls, index)
+                    logger.info("pgview created index %s on view %s (%s)", index.name, view_name, schema_name_log)
 
         if view_exists:
             return "UPDATED"
 
         return "CREATED"
-    finally:
-        cursor_wrapper.close()
 
 
 @transaction.atomic()
-def create_view(connection, view_name, view_query: ViewSQL, update=True, force=False):
+def create_view(connection, view_name, view_query: ViewSQL, update=True, force=False, introspection=None, cursor=None):
     """
     Create a named view on a connection.
 
@@ -284,66 +537,74 @@ def create_view(connection, view_name, view_query: ViewSQL, update=True, force=F
     existing view's schema is incompatible with the new definition, ``force``
     (default: False) controls whether or not to drop the old view and create
     the new one.
+
+    If ``introspection`` is passed (a ViewIntrospection for the connection),
+    it's used instead of querying whether the view exists.
+
+    If ``cursor`` is passed (a cursor on the connection), it's used instead
+    of opening a new one, and left open.
     """
 
     vschema, vname = _schema_and_name(connection, view_name)
 
-    cursor_wrapper = connection.cursor()
-    cursor = cursor_wrapper.cursor
-    try:
+    with _use_cursor(connection, cursor) as db_cursor:
         force_required = False
         # Determine if view already exists.
-        view_exists_where, view_exists_params = _make_where(table_schema=vschema, table_name=vname)
-        cursor.execute(
-            f"SELECT COUNT(*) FROM information_schema.views WHERE {view_exists_where};",
-            view_exists_params,
-        )
-        view_exists = cursor.fetchone()[0] > 0
+        if introspection is not None:
+            view_exists, _ = introspection.lookup(vschema, vname, materialized=False)
+        else:
+            view_exists_where, view_exists_params = _make_where(table_schema=vschema, table_name=vname)
+            db_cursor.execute(
+                f"SELECT COUNT(*) FROM information_schema.views WHERE {view_exists_where};",
+                view_exists_params,
+            )
+            view_exists = db_cursor.fetchone()[0] > 0
         if view_exists and not update:
             return "EXISTS"
         elif view_exists:
-            # Detect schema conflict by copying the original view, attempting to
-            # update this copy, and detecting errors.
-            cursor.execute(f"CREATE TEMPORARY VIEW check_conflict AS SELECT * FROM {view_name};")
+            # Replace the view directly in a savepoint, Postgres refuses to do so
+            # if the new definition conflicts with the schema of the existing view.
             try:
-                with transaction.atomic():
-                    cursor.execute(
-                        f"CREATE OR REPLACE TEMPORARY VIEW check_conflict AS {view_query.query};",
-                        view_query.params,
-                    )
+                with transaction.atomic(using=connection.alias):
+                    db_cursor.execute(f"CREATE OR REPLACE VIEW {view_name} AS {view_query.query};", view_query.params)
+                return "UPDATED"
             except ProgrammingError:
                 force_required = True
-            finally:
-                cursor.execute("DROP VIEW IF EXISTS check_conflict;")
 
         if not force_required:
-            cursor.execute(f"CREATE OR REPLACE VIEW {view_name} AS {view_query.query};", view_query.params)
-            ret = view_exists and "UPDATED" or "CREATED"
+            db_cursor.execute(f"CREATE OR REPLACE VIEW {view_name} AS {view_query.query};", view_query.params)
+            ret = "CREATED"
         elif force:
-            cursor.execute(f"DROP VIEW IF EXISTS {view_name} CASCADE;")
-            cursor.execute(f"CREATE VIEW {view_name} AS {view_query.query};", view_query.params)
+            db_cursor.execute(f"DROP VIEW IF EXISTS {view_name} CASCADE;")
+            if introspection is not None:
+                introspection.invalidate()
+            db_cursor.execute(f"CREATE VIEW {view_name} AS {view_query.query};", view_query.params)
             ret = "FORCED"
         else:
             ret = "FORCE_REQUIRED"
 
         return ret
-    finally:
-        cursor_wrapper.close()
 
 
 def clear_view(connection, view_name, materialized=False):
     """
     Remove a named view on connection.
     """
-    cursor_wrapper = connection.cursor()
-    cursor = cursor_wrapper.cursor
-    try:
+    return clear_views(connection, [view_name], materialized=materialized)
+
+
+def clear_views(connection, view_names, materialized=False):
+    """
+    Remove several named views on connection using a single statement.
+    """
+    if not view_names:
+        return "DROPPED"
+    names = ", ".join(view_names)
+    with _use_cursor(connection) as db_cursor:
         if materialized:
-            cursor.execute(f"DROP MATERIALIZED VIEW IF EXISTS {view_name} CASCADE")
+            db_cursor.execute(f"DROP MATERIALIZED VIEW IF EXISTS {names} CASCADE")
         else:
-            cursor.execute(f"DROP VIEW IF EXISTS {view_name} CASCADE")
-    finally:
-        cursor_wrapper.close()
+            db_cursor.execute(f"DROP VIEW IF EXISTS {names} CASCADE")
     return "DROPPED"
 
 
@@ -363,10 +624,10 @@ class ViewMeta(models.base.ModelBase):
             if isinstance(field_name, models.Field):
                 attrs[field_name.name] = copy.copy(field_name)
             elif isinstance(field_name, str):
-                match = FIELD_SPEC_RE.match(field_name)
-                if not match:
+                field_spec = _parse_field_spec(field_name)
+                if field_spec is None:
                     raise TypeError(f"Unrecognized field specifier: {field_name!r}")
-                deferred_projections.append(match.groups())
+                deferred_projections.append(field_spec)
             else:
                 raise TypeError(f"Unrecognized field specifier: {field_name!r}")
 
@@ -439,6 +700,13 @@ def _realise_projections(app_label, model_name):
         realize_deferred_projections(model_cls)
 
 
+def get_view_models():
+    """
+    Return all installed models which are subclasses of View.
+    """
+    return tuple(model for model in apps.get_models() if issubclass(model, View))
+
+
 class ReadOnlyViewQuerySet(QuerySet):
     def _raw_delete(self, *args, **kwargs):
         return 0
@@ -485,6 +753,7 @@ class MaterializedView(View):
     """
 
     with_data = True
+    rebuild_online = False
 
     @classmethod
     def refresh(cls, concurrently=False):
@@ -9,18 +9,12 @@ class Observation(models.Model):
 
 
 VIEW_SQL = """
-WITH summary AS (
-    SELECT
-        date_trunc('month', date) AS date,
-        count(*)
-    FROM multidbtest_observation
-    GROUP BY 1
-    ORDER BY date
-) SELECT
-    ROW_NUMBER() OVER () AS id,
-    date,
-    count
-FROM summary;
+SELECT
+    to_char(date_trunc('month', date), 'YYYYMM')::integer AS id,
+    date_trunc('month', date) AS date,
+    count(*)
+FROM multidbtest_observation
+GROUP BY date_trunc('month', date);
 """
 
 
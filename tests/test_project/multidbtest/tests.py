@@ -1,12 +1,14 @@
 import datetime as dt
+from unittest import mock
 
 from django.core.management import call_command
 from django.db import DEFAULT_DB_ALIAS, connections
-from django.dispatch import receiver
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase
 
 from django_pgviews.signals import view_synced
+from django_pgviews.view import _drop_mat_view
 
+from ..utils import capture_signal
 from ..viewtest.models import RelatedView
 from .models import MonthlyObservation, Observation
 
@@ -32,16 +34,23 @@ class WeatherPinnedRefreshViewTest(TestCase):
 
     databases = {DEFAULT_DB_ALIAS, "weather_db"}
 
+    @classmethod
+    def setUpTestData(cls):
+        Observation.objects.bulk_create(
+            [
+                Observation(date=dt.date(2022, 1, 1), temperature=10),
+                Observation(date=dt.date(2022, 1, 3), temperature=20),
+            ]
+        )
+
     def test_pre_refresh(self):
-        Observation.objects.create(date=dt.date(2022, 1, 1), temperature=10)
-        Observation.objects.create(date=dt.date(2022, 1, 3), temperature=20)
         self.assertEqual(MonthlyObservation.objects.count(), 0)
 
     def test_refresh(self):
-        Observation.objects.create(date=dt.date(2022, 1, 1), temperature=10)
-        Observation.objects.create(date=dt.date(2022, 1, 3), temperature=20)
         MonthlyObservation.refresh()
         self.assertEqual(MonthlyObservation.objects.count(), 1)
+        # the rows are keyed by their month
+        self.assertEqual(MonthlyObservation.objects.get().id, 202201)
 
 
 class WeatherPinnedMigrateTest(TestCase):
@@ -50,24 +59,14 @@ class WeatherPinnedMigrateTest(TestCase):
     databases = {DEFAULT_DB_ALIAS, "weather_db"}
 
     def test_default(self):
-        synced_views = []
-
-        @receiver(view_synced)
-        def on_view_synced(sender, **kwargs):
-            synced_views.append(sender)
-
-        call_command("migrate", database=DEFAULT_DB_ALIAS)
+        with capture_signal(view_synced) as synced_views:
+            call_command("migrate", database=DEFAULT_DB_ALIAS)
         self.assertNotIn(MonthlyObservation, synced_views)
         self.assertIn(RelatedView, synced_views)
 
     def test_weather_db(self):
-        synced_views = []
-
-        @receiver(view_synced)
-        def on_view_synced(sender, **kwargs):
-            synced_views.append(sender)
-
-        call_command("migrate", database="weather_db")
+        with capture_signal(view_synced) as synced_views:
+            call_command("migrate", database="weather_db")
         self.assertIn(MonthlyObservation, synced_views)
         self.assertNotIn(RelatedView, synced_views)
 
@@ -78,24 +77,14 @@ class WeatherPinnedSyncPGViewsTest(TestCase):
     databases = {DEFAULT_DB_ALIAS, "weather_db"}
 
     def test_default(self):
-        synced_views = []
-
-        @receiver(view_synced)
-        def on_view_synced(sender, **kwargs):
-            synced_views.append(sender)
-
-        call_command("sync_pgviews", database=DEFAULT_DB_ALIAS)
+        with capture_signal(view_synced) as synced_views:
+            call_command("sync_pgviews", database=DEFAULT_DB_ALIAS)
         self.assertNotIn(MonthlyObservation, synced_views)
         self.assertIn(RelatedView, synced_views)
 
     def test_weather_db(self):
-        synced_views = []
-
-        @receiver(view_synced)
-        def on_view_synced(sender, **kwargs):
-            synced_views.append(sender)
-
-        call_command("sync_pgviews", database="weather_db")
+        with capture_signal(view_synced) as synced_views:
+            call_command("sync_pgviews", database="weather_db")
         self.assertIn(MonthlyObservation, synced_views)
         self.assertNotIn(RelatedView, synced_views)
 
@@ -114,3 +103,40 @@ class WeatherPinnedRefreshPGViewsTest(TestCase):
         Observation.objects.create(date=dt.date(2022, 1, 1), temperature=10)
         call_command("refresh_pgviews", database="weather_db")
         self.assertEqual(MonthlyObservation.objects.count(), 1)
+
+
+class WeatherPinnedRebuildOnlineTest(TransactionTestCase):
+    """Ensure rebuilding a view online swaps it in a transaction on the view's own database."""
+
+    databases = {DEFAULT_DB_ALIAS, "weather_db"}
+
+    def get_matview_names(self):
+        with connections["weather_db"].cursor() as cursor:
+            cursor.execute("SELECT matviewname FROM pg_matviews WHERE matviewname LIKE 'multidbtest_%%';")
+            return {x[0] for x in cursor.fetchall()}
+
+    def test_rebuild_online(self):
+        Observation.objects.create(date=dt.date(2022, 1, 1), temperature=10)
+
+        with mock.patch.object(MonthlyObservation, "rebuild_online", True):
+            call_command("sync_pgviews", database="weather_db")
+
+        self.assertEqual(MonthlyObservation.objects.get().id, 202201)
+        self.assertEqual(self.get_matview_names(), {"multidbtest_monthlyobservation"})
+
+    def test_rebuild_online_failure_rolled_back(self):
+        Observation.objects.create(date=dt.date(2022, 1, 1), temperature=10)
+
+        def drop_and_fail(cursor, view_name):
+            _drop_mat_view(cursor, view_name)
+            if view_name == MonthlyObservation._meta.db_table:
+                raise RuntimeError("rename failed")
+
+        with mock.patch.object(MonthlyObservation, "rebuild_online", True), mock.patch(
+            "django_pgviews.view._drop_mat_view", side_effect=drop_and_fail
+        ), self.assertRaises(RuntimeError):
+            call_command("sync_pgviews", database="weather_db")
+
+        # the old version of the view is still there, without the data of the failed rebuild
+        self.assertEqual(self.get_matview_names(), {"multidbtest_monthlyobservation"})
+        self.assertEqual(MonthlyObservation.objects.count(), 0)
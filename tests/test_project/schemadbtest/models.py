@@ -11,18 +11,12 @@ class SchemaObservation(models.Model):
 
 
 VIEW_SQL = """
-WITH summary AS (
-    SELECT
-        date_trunc('month', date) AS date,
-        count(*)
-    FROM schemadbtest_schemaobservation
-    GROUP BY 1
-    ORDER BY date
-) SELECT
-    ROW_NUMBER() OVER () AS id,
-    date,
-    count
-FROM summary;
+SELECT
+    to_char(date_trunc('month', date), 'YYYYMM')::integer AS id,
+    date_trunc('month', date) AS date,
+    count(*)
+FROM schemadbtest_schemaobservation
+GROUP BY date_trunc('month', date);
 """
 
 
@@ -42,8 +36,19 @@ class SchemaMonthlyObservationMaterializedView(view.MaterializedView):
         indexes = [models.Index(fields=["date"])]
 
 
+# databases the schema has already been created in, pre_migrate is sent once per app on every migrate
+_schemas_created = set()
+
+
 @receiver(signals.pre_migrate)
 def create_test_schema(sender, app_config, using, **kwargs):
+    connection = connections[using]
+    # keyed on the database name too, since it changes to the test database's name once that's created
+    key = (using, connection.settings_dict["NAME"])
+    if key in _schemas_created:
+        return
+
     command = "CREATE SCHEMA IF NOT EXISTS {};".format("other")
-    with connections[using].cursor() as cursor:
+    with connection.cursor() as cursor:
         cursor.execute(command)
+    _schemas_created.add(key)
@@ -3,11 +3,11 @@ from contextlib import closing
 
 from django.core.management import call_command
 from django.db import DEFAULT_DB_ALIAS, connections
-from django.dispatch import receiver
 from django.test import TestCase
 
 from django_pgviews.signals import view_synced
 
+from ..utils import capture_signal
 from ..viewtest.models import RelatedView
 from ..viewtest.tests import get_list_of_indexes
 from .models import SchemaMonthlyObservationMaterializedView, SchemaMonthlyObservationView, SchemaObservation
@@ -90,40 +90,19 @@ class SchemaTest(TestCase):
         SchemaObservation.objects.create(date=dt.date(2022, 1, 3), temperature=20)
         SchemaMonthlyObservationMaterializedView.refresh()
         self.assertEqual(SchemaMonthlyObservationMaterializedView.objects.count(), 1)
+        self.assertEqual(SchemaMonthlyObservationMaterializedView.objects.get().id, 202201)
 
     def test_view_exists_on_sync(self):
-        synced = []
-
-        @receiver(view_synced)
-        def on_view_synced(sender, **kwargs):
-            synced.append(sender)
-            if sender == SchemaMonthlyObservationView:
-                self.assertEqual(
-                    dict(
-                        {"status": "EXISTS", "has_changed": False},
-                        update=False,
-                        force=False,
-                        signal=view_synced,
-                        using="schema_db",
-                    ),
-                    kwargs,
-                )
-            if sender == SchemaMonthlyObservationMaterializedView:
-                self.assertEqual(
-                    dict(
-                        {"status": "UPDATED", "has_changed": True},
-                        update=False,
-                        force=False,
-                        signal=view_synced,
-                        using="schema_db",
-                    ),
-                    kwargs,
-                )
-
-        call_command("sync_pgviews", database="schema_db", update=False)
-
-        self.assertIn(SchemaMonthlyObservationView, synced)
-        self.assertIn(SchemaMonthlyObservationMaterializedView, synced)
+        with capture_signal(view_synced) as synced:
+            call_command("sync_pgviews", database="schema_db", update=False)
+
+        expected_kwargs = {"update": False, "force": False, "signal": view_synced, "using": "schema_db"}
+        self.assertEqual(
+            dict(expected_kwargs, status="EXISTS", has_changed=False), synced[SchemaMonthlyObservationView]
+        )
+        self.assertEqual(
+            dict(expected_kwargs, status="UPDATED", has_changed=True), synced[SchemaMonthlyObservationMaterializedView]
+        )
 
     def test_sync_pgviews_materialized_views_check_sql_changed(self):
         self.assertEqual(SchemaObservation.objects.count(), 0, "Test started with non-empty SchemaObservation")
@@ -0,0 +1,19 @@
+from contextlib import contextmanager
+
+
+@contextmanager
+def capture_signal(signal):
+    """
+    Collects the senders of a signal sent inside the block, mapped to the kwargs they sent it with, and disconnects
+    the receiver afterwards, so it can't catch signals sent by other tests.
+    """
+    sent = {}
+
+    def on_signal(sender, **kwargs):
+        sent[sender] = kwargs
+
+    signal.connect(on_signal)
+    try:
+        yield sent
+    finally:
+        signal.disconnect(on_signal)
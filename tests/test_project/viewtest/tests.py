@@ -2,22 +2,34 @@
 
 from contextlib import closing
 from datetime import timedelta
+from unittest import mock
 
 from django.apps import apps
 from django.conf import settings
 from django.contrib import auth
 from django.contrib.auth.models import User
 from django.core.management import call_command
-from django.db import DEFAULT_DB_ALIAS, connection
+from django.db import DEFAULT_DB_ALIAS, connection, connections
 from django.db.models.signals import post_migrate
-from django.db.utils import DatabaseError, OperationalError
-from django.dispatch import receiver
-from django.test import TestCase, override_settings
+from django.db.utils import DatabaseError, IntegrityError, OperationalError
+from django.test import TestCase, TransactionTestCase, override_settings
 from django.utils import timezone
 
+from django_pgviews.models import _sort_by_dependencies
 from django_pgviews.signals import all_views_synced, view_synced
-from django_pgviews.view import _make_where, _schema_and_name
-
+from django_pgviews.view import (
+    FIELD_SPEC_RE,
+    ViewIntrospection,
+    _create_concurrent_index_sql,
+    _drop_mat_view,
+    _make_where,
+    _parse_field_spec,
+    _schema_and_name,
+    get_view_models,
+)
+
+from ..multidbtest.models import MonthlyObservation
+from ..utils import capture_signal
 from . import models
 from .models import LatestSuperusers
 
@@ -201,6 +213,105 @@ class ViewTestCase(TestCase):
 
             self.assertEqual(new_indexes, orig_indexes)
 
+    def test_materialized_view_rebuild_online(self):
+        models.TestModel.objects.create(name="Test")
+
+        with connection.cursor() as cursor:
+            orig_custom_schema_indexes = get_list_of_indexes(
+                cursor, models.CustomSchemaMaterializedRelatedViewWithIndex
+            )
+
+        patch_custom_schema = mock.patch.object(
+            models.CustomSchemaMaterializedRelatedViewWithIndex, "rebuild_online", True
+        )
+        with mock.patch.object(models.MaterializedRelatedViewWithIndex, "rebuild_online", True), patch_custom_schema:
+            call_command("sync_pgviews", update=False)
+
+        self.assertEqual(models.MaterializedRelatedViewWithIndex.objects.count(), 1)
+
+        with connection.cursor() as cursor:
+            indexes = get_list_of_indexes(cursor, models.MaterializedRelatedViewWithIndex)
+            self.assertIn("viewtest_materializedrelatedviewwithindex_id_index", indexes)
+            self.assertEqual(len(indexes), 2)
+
+            # the indexes of a view in another schema are renamed in that schema
+            custom_schema_indexes = get_list_of_indexes(cursor, models.CustomSchemaMaterializedRelatedViewWithIndex)
+            self.assertEqual(custom_schema_indexes, orig_custom_schema_indexes)
+
+            cursor.execute(
+                "SELECT COUNT(*) FROM pg_matviews WHERE matviewname = 'viewtest_materializedrelatedviewwithindex_new';"
+            )
+            (count,) = cursor.fetchone()
+            self.assertEqual(count, 0)
+
+    def test_materialized_view_rebuild_online_keeps_old_view_readable(self):
+        models.TestModel.objects.create(name="Test")
+        other_connection = connections.create_connection(DEFAULT_DB_ALIAS)
+        counts = []
+
+        def drop_with_check(cursor, view_name):
+            if view_name == models.MaterializedRelatedViewWithIndex._meta.db_table:
+                # the new version is fully indexed before the old one gets dropped
+                self.assertEqual(
+                    get_list_of_indexes(cursor, models.MaterializedRelatedViewWithIndex),
+                    {"viewtest_materializedrelatedviewwithindex_id_index", "viewtest_ma_model_i_619837_idx"},
+                )
+                cursor.execute(
+                    "SELECT indexname FROM pg_indexes WHERE tablename = 'viewtest_materializedrelatedviewwithindex_new'"
+                )
+                self.assertEqual(
+                    {x[0] for x in cursor.fetchall()},
+                    {"viewtest_materializedrelatedviewwithindex_id_index_new", "viewtest_ma_model_i_619837_idx_new"},
+                )
+
+                # the old version isn't locked by building the new one
+                with other_connection.cursor() as other_cursor:
+                    other_cursor.execute("SET lock_timeout = '2s';")
+                    other_cursor.execute("SELECT COUNT(*) FROM viewtest_materializedrelatedviewwithindex;")
+                    counts.append(other_cursor.fetchone()[0])
+
+            _drop_mat_view(cursor, view_name)
+
+        try:
+            with mock.patch.object(models.MaterializedRelatedViewWithIndex, "rebuild_online", True), mock.patch(
+                "django_pgviews.view._drop_mat_view", side_effect=drop_with_check
+            ):
+                call_command("sync_pgviews", update=False)
+        finally:
+            other_connection.close()
+
+        # the other connection can't see the uncommitted row, it reads the old version
+        self.assertEqual(counts, [0])
+        self.assertEqual(models.MaterializedRelatedViewWithIndex.objects.count(), 1)
+
+    def test_materialized_view_rebuild_online_replaces_stale_new_view(self):
+        with connection.cursor() as cursor:
+            # left over by an earlier rebuild which failed midway
+            cursor.execute("CREATE MATERIALIZED VIEW viewtest_materializedrelatedviewwithindex_new AS SELECT 1 AS foo;")
+            cursor.execute(
+                "CREATE INDEX viewtest_materializedrelatedviewwithindex_id_index_new "
+                "ON viewtest_materializedrelatedviewwithindex_new (foo);"
+            )
+
+        models.TestModel.objects.create(name="Test")
+
+        with mock.patch.object(models.MaterializedRelatedViewWithIndex, "rebuild_online", True):
+            call_command("sync_pgviews", update=False)
+
+        self.assertEqual(models.MaterializedRelatedViewWithIndex.objects.count(), 1)
+
+        with connection.cursor() as cursor:
+            self.assertEqual(
+                get_list_of_indexes(cursor, models.MaterializedRelatedViewWithIndex),
+                {"viewtest_materializedrelatedviewwithindex_id_index", "viewtest_ma_model_i_619837_idx"},
+            )
+
+            cursor.execute(
+                "SELECT COUNT(*) FROM pg_matviews WHERE matviewname = 'viewtest_materializedrelatedviewwithindex_new';"
+            )
+            (count,) = cursor.fetchone()
+            self.assertEqual(count, 0)
+
     def test_materialized_view_with_no_data(self):
         """
         Test a materialized view with no data works correctly
@@ -222,27 +333,17 @@ class ViewTestCase(TestCase):
             models.MaterializedRelatedView: {"status": "UPDATED", "has_changed": True},
             models.Superusers: {"status": "EXISTS", "has_changed": False},
         }
-        synced_views = []
-        all_views_were_synced = [False]
-
-        @receiver(view_synced)
-        def on_view_synced(sender, **kwargs):
-            synced_views.append(sender)
-            if sender in expected:
-                expected_kwargs = expected.pop(sender)
-                self.assertEqual(
-                    dict(expected_kwargs, update=False, force=False, signal=view_synced, using=DEFAULT_DB_ALIAS), kwargs
-                )
-
-        @receiver(all_views_synced)
-        def on_all_views_synced(sender, **kwargs):
-            all_views_were_synced[0] = True
+        with capture_signal(view_synced) as synced_views, capture_signal(all_views_synced) as all_synced:
+            call_command("sync_pgviews", update=False)
 
-        call_command("sync_pgviews", update=False)
+        for view_cls, expected_kwargs in expected.items():
+            self.assertEqual(
+                dict(expected_kwargs, update=False, force=False, signal=view_synced, using=DEFAULT_DB_ALIAS),
+                synced_views[view_cls],
+            )
 
         # All views went through syncing
-        self.assertEqual(all_views_were_synced[0], True)
-        self.assertFalse(expected)
+        self.assertEqual(all_synced, {None: {"signal": all_views_synced, "using": DEFAULT_DB_ALIAS}})
         self.assertEqual(len(synced_views), 12)
 
     def test_get_sql(self):
@@ -345,6 +446,76 @@ class TestMaterializedViewsCheckSQLSettings(TestCase):
         settings.MATERIALIZED_VIEWS_CHECK_SQL_CHANGED = False
 
 
+def get_index_validity(cursor, cls):
+    schema, table = _schema_and_name(cursor.connection, cls._meta.db_table)
+    where_fragment, params = _make_where(**{"n.nspname": schema, "t.relname": table})
+    cursor.execute(
+        "SELECT i.relname, x.indisvalid FROM pg_index x "
+        "JOIN pg_class i ON i.oid = x.indexrelid "
+        "JOIN pg_class t ON t.oid = x.indrelid "
+        f"JOIN pg_namespace n ON n.oid = t.relnamespace WHERE {where_fragment}",
+        params,
+    )
+    return dict(cursor.fetchall())
+
+
+class ConcurrentIndexesTestCase(TransactionTestCase):
+    """
+    Outside of a transaction the indexes of an unchanged materialized view are reconciled concurrently.
+    """
+
+    def test_indexes_reconciled_concurrently(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DROP INDEX viewtest_materializedrelatedviewwithindex_id_index;")
+            cursor.execute("CREATE INDEX viewtest_extra_index ON viewtest_materializedrelatedviewwithindex (id);")
+
+        with mock.patch(
+            "django_pgviews.view._create_concurrent_index_sql", wraps=_create_concurrent_index_sql
+        ) as create_concurrent_index_sql:
+            call_command("sync_pgviews", materialized_views_check_sql_changed=True)
+
+        create_concurrent_index_sql.assert_called_once_with(
+            models.MaterializedRelatedViewWithIndex._meta.db_table, "id", concurrently=True
+        )
+
+        with connection.cursor() as cursor:
+            self.assertEqual(
+                get_index_validity(cursor, models.MaterializedRelatedViewWithIndex),
+                {"viewtest_materializedrelatedviewwithindex_id_index": True, "viewtest_ma_model_i_619837_idx": True},
+            )
+
+    def test_invalid_index_recreated(self):
+        models.TestModel.objects.create(name="Bob")
+        models.TestModel.objects.create(name="Alice")
+        models.MaterializedRelatedViewWithIndex.refresh()
+
+        with connection.cursor() as cursor:
+            # a concurrent build which fails leaves the index behind, marked as invalid
+            cursor.execute("DROP INDEX viewtest_ma_model_i_619837_idx;")
+            with self.assertRaises(IntegrityError):
+                cursor.execute(
+                    "CREATE UNIQUE INDEX CONCURRENTLY viewtest_ma_model_i_619837_idx "
+                    "ON viewtest_materializedrelatedviewwithindex ((1));"
+                )
+            self.assertFalse(
+                get_index_validity(cursor, models.MaterializedRelatedViewWithIndex)["viewtest_ma_model_i_619837_idx"]
+            )
+
+        call_command("sync_pgviews", materialized_views_check_sql_changed=True)
+
+        with connection.cursor() as cursor:
+            self.assertEqual(
+                get_index_validity(cursor, models.MaterializedRelatedViewWithIndex),
+                {"viewtest_materializedrelatedviewwithindex_id_index": True, "viewtest_ma_model_i_619837_idx": True},
+            )
+
+        self.assertEqual(models.MaterializedRelatedViewWithIndex.objects.count(), 2)
+
+    def tearDown(self):
+        models.TestModel.objects.all().delete()
+        models.MaterializedRelatedViewWithIndex.refresh()
+
+
 class DependantViewTestCase(TestCase):
     def test_sync_depending_views(self):
         """
@@ -419,6 +590,123 @@ class DependantViewTestCase(TestCase):
             with self.assertRaises(DatabaseError):
                 cur.execute("""SELECT name from viewtest_dependantmaterializedview;""")
 
+    def test_sort_by_dependencies(self):
+        ordered, circular = _sort_by_dependencies([models.DependantView, models.RelatedView, models.LatestSuperusers])
+        self.assertEqual(ordered, [models.RelatedView, models.LatestSuperusers, models.DependantView])
+        self.assertEqual(circular, [])
+
+    def test_sort_by_dependencies_circular(self):
+        with mock.patch.object(models.RelatedView, "_dependencies", ("viewtest.DependantView",)):
+            ordered, circular = _sort_by_dependencies(
+                [models.DependantView, models.RelatedView, models.LatestSuperusers]
+            )
+        self.assertEqual(ordered, [models.LatestSuperusers])
+        self.assertEqual(circular, [models.DependantView, models.RelatedView])
+
+    def test_sync_circular_dependencies(self):
+        """
+        Views outside of a dependency cycle still get synced, the views in it are skipped.
+        """
+        with closing(connection.cursor()) as cur:
+            cur.execute("DROP VIEW viewtest_superusers;")
+
+        patch_dependencies = mock.patch.object(models.RelatedView, "_dependencies", ("viewtest.DependantView",))
+        capture_all_views_synced = capture_signal(all_views_synced)
+        with patch_dependencies, capture_all_views_synced as all_synced, self.assertLogs(
+            "django_pgviews.sync_pgviews", level="WARNING"
+        ) as logs:
+            call_command("sync_pgviews", update=False)
+
+        self.assertEqual(all_synced, {})
+        self.assertIn("skipped viewtest.RelatedView, viewtest.DependantView", logs.output[-1])
+        self.assertEqual(models.Superusers.objects.count(), 0)
+
+
+class ViewIntrospectionTestCase(TestCase):
+    def test_lookup(self):
+        introspection = ViewIntrospection(connection)
+
+        self.assertEqual(introspection.lookup("public", "viewtest_relatedview", materialized=False), (True, None))
+        self.assertEqual(introspection.lookup("public", "viewtest_relatedview", materialized=True), (False, None))
+        self.assertEqual(introspection.lookup("test_schema", "viewtest_relatedview", materialized=False), (False, None))
+        self.assertEqual(introspection.lookup("public", "viewtest_missingview", materialized=False), (False, None))
+
+        exists, definition = introspection.lookup("public", "viewtest_materializedrelatedview", materialized=True)
+        self.assertTrue(exists)
+        self.assertIn("viewtest_testmodel", definition)
+
+    def test_lookup_any_schema(self):
+        introspection = ViewIntrospection(connection)
+
+        self.assertEqual(introspection.lookup(None, "viewtest_relatedview", materialized=False), (True, None))
+        self.assertEqual(introspection.lookup(None, "my_custom_view", materialized=False), (True, None))
+        self.assertEqual(introspection.lookup(None, "my_custom_view", materialized=True), (False, None))
+        self.assertEqual(introspection.lookup(None, "viewtest_missingview", materialized=False), (False, None))
+
+        exists, definition = introspection.lookup(None, "my_custom_view_with_index", materialized=True)
+        self.assertTrue(exists)
+        self.assertIn("viewtest_testmodel", definition)
+
+    def test_indexes(self):
+        introspection = ViewIntrospection(connection)
+
+        self.assertEqual(
+            introspection.indexes("public", "viewtest_materializedrelatedviewwithindex"),
+            {"viewtest_materializedrelatedviewwithindex_id_index": True, "viewtest_ma_model_i_619837_idx": True},
+        )
+        self.assertEqual(introspection.indexes("test_schema", "viewtest_materializedrelatedviewwithindex"), {})
+        self.assertEqual(
+            introspection.indexes(None, "my_custom_view_with_index"),
+            {"test_schema_my_custom_view_with_index_id_index": True, "test_schema_model_i_11aeb2_idx": True},
+        )
+
+    def test_indexes_fetched_lazily(self):
+        introspection = ViewIntrospection(connection)
+
+        with mock.patch.object(introspection, "_fetch_indexes", wraps=introspection._fetch_indexes) as fetch_indexes:
+            introspection.lookup("public", "viewtest_materializedrelatedviewwithindex", materialized=True)
+            fetch_indexes.assert_not_called()
+
+            introspection.indexes("public", "viewtest_materializedrelatedviewwithindex")
+            introspection.indexes("public", "viewtest_materializedrelatedview")
+            fetch_indexes.assert_called_once_with()
+
+            introspection.invalidate()
+            introspection.indexes("public", "viewtest_materializedrelatedviewwithindex")
+            self.assertEqual(fetch_indexes.call_count, 2)
+
+    def test_invalidate_after_cascade(self):
+        introspection = ViewIntrospection(connection)
+        self.assertEqual(introspection.lookup("public", "viewtest_dependantview", materialized=False), (True, None))
+
+        with connection.cursor() as cursor:
+            cursor.execute("DROP VIEW viewtest_relatedview CASCADE;")
+
+        # the cached state is stale until invalidated
+        self.assertEqual(introspection.lookup("public", "viewtest_dependantview", materialized=False), (True, None))
+
+        introspection.invalidate()
+
+        self.assertEqual(introspection.lookup("public", "viewtest_relatedview", materialized=False), (False, None))
+        self.assertEqual(introspection.lookup("public", "viewtest_dependantview", materialized=False), (False, None))
+
+
+class GetViewModelsTestCase(TestCase):
+    def test_get_view_models(self):
+        view_models = get_view_models()
+        self.assertIn(models.RelatedView, view_models)
+        self.assertIn(MonthlyObservation, view_models)
+        self.assertNotIn(models.TestModel, view_models)
+
+    def test_follows_installed_apps(self):
+        get_view_models()
+
+        with override_settings(INSTALLED_APPS=["django_pgviews", "test_project.viewtest"]):
+            view_models = get_view_models()
+
+        self.assertIn(models.RelatedView, view_models)
+        self.assertNotIn(MonthlyObservation, view_models)
+
 
 class MakeWhereTestCase(TestCase):
     def test_with_schema(self):
@@ -433,13 +721,33 @@ class MakeWhereTestCase(TestCase):
 
     def test_with_schema_list(self):
         where_fragment, params = _make_where(schemaname="test_schema", tablename=["test_tablename1", "test_tablename2"])
-        self.assertEqual(where_fragment, "schemaname = %s AND tablename IN (%s, %s)")
-        self.assertEqual(params, ["test_schema", "test_tablename1", "test_tablename2"])
+        self.assertEqual(where_fragment, "schemaname = %s AND tablename = ANY(%s)")
+        self.assertEqual(params, ["test_schema", ["test_tablename1", "test_tablename2"]])
 
     def test_no_schema_list(self):
         where_fragment, params = _make_where(schemaname=None, tablename=["test_tablename1", "test_tablename2"])
-        self.assertEqual(where_fragment, "tablename IN (%s, %s)")
-        self.assertEqual(params, ["test_tablename1", "test_tablename2"])
+        self.assertEqual(where_fragment, "tablename = ANY(%s)")
+        self.assertEqual(params, [["test_tablename1", "test_tablename2"]])
+
+
+class FieldSpecTestCase(TestCase):
+    def test_parse_field_spec(self):
+        self.assertEqual(_parse_field_spec("auth.User.username"), ("auth", "User", "username"))
+        self.assertEqual(_parse_field_spec("auth.User.*"), ("auth", "User", "*"))
+
+    def test_parse_field_spec_invalid(self):
+        invalid = (
+            "auth.User",
+            "auth.User.username.extra",
+            "auth.User.",
+            "auth.1User.id",
+            "auth.User.na-me",
+            "auth.Usér.id",
+        )
+        for field_name in invalid:
+            with self.subTest(field_name=field_name):
+                self.assertIsNone(_parse_field_spec(field_name))
+                self.assertIsNone(FIELD_SPEC_RE.match(field_name))
 
 
 class TestMaterializedViewSyncDisabledSettings(TestCase):